@@ -1,12 +1,39 @@
 import argparse
+import asyncio
+import dataclasses
+import difflib
+import importlib.metadata
+import io
+import itertools
+import json
 import logging
 import os
+import re
+import shutil
 import subprocess
 import sys
+import tokenize
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache, partial
 from pathlib import Path
-from typing import Iterable
+from typing import Any, Callable, ClassVar, Iterable, Iterator
+
+try:
+    import autoflake
+except ImportError:  # pragma: no cover - falls back to ``python -m autoflake``
+    autoflake = None
+
+try:
+    import black
+except ImportError:  # pragma: no cover - falls back to ``python -m black``
+    black = None
+
+try:
+    import isort
+except ImportError:  # pragma: no cover - falls back to ``python -m isort``
+    isort = None
 
 
 # ------------------------------------------------------------------------------
@@ -28,6 +55,17 @@ LOGGER.addHandler(handler)
 REPO_ROOT = Path(__file__).resolve().parents[1]
 APP_PATH = REPO_ROOT / "src"
 
+# Tool configuration files whose changes invalidate the --fast cache.
+TOOL_CONFIGS = (
+    "pyproject.toml",
+    "setup.cfg",
+    "tox.ini",
+    ".isort.cfg",
+    ".editorconfig",
+    "ruff.toml",
+    ".ruff.toml",
+)
+
 
 # ------------------------------------------------------------------------------
 # Models
@@ -36,91 +74,572 @@ APP_PATH = REPO_ROOT / "src"
 @dataclass(slots=True)
 class RunResult:
     code: int
-    stdout: str
-    stderr: str
+    raw_stdout: bytes = b""
+    raw_stderr: bytes = b""
+    # Files the tool still reported problems for, even with a zero exit code.
+    reported: frozenset[str] = frozenset()
+
+    # Output is kept as bytes and decoded on each access: test ``raw_*`` for
+    # emptiness and read these at most once.
+    @property
+    def stdout(self) -> str:
+        return self.raw_stdout.decode("utf-8", errors="replace")
+
+    @property
+    def stderr(self) -> str:
+        return self.raw_stderr.decode("utf-8", errors="replace")
+
+
+def merge_results(results: Iterable[RunResult]) -> RunResult:
+    results = list(results)
+
+    # Compared by magnitude so that signal exits (negative codes) survive.
+    return RunResult(
+        max((result.code for result in results), key=abs, default=0),
+        b"\n".join(result.raw_stdout for result in results if result.raw_stdout),
+        b"\n".join(result.raw_stderr for result in results if result.raw_stderr),
+        frozenset().union(*(result.reported for result in results)),
+    )
 
 
 # ------------------------------------------------------------------------------
 # Utils
 # ------------------------------------------------------------------------------
 
-def get_env() -> dict[str, str]:
-    env = os.environ.copy()
-    env["PYTHONIOENCODING"] = "utf-8"
-    env["LC_ALL"] = "C.UTF-8"
-    env["LANG"] = "C.UTF-8"
-    return env
+# Built once at import and shared by every subprocess: later changes to
+# os.environ are not seen by the formatters.
+_ENV: dict[str, str] = {
+    **os.environ,
+    "PYTHONIOENCODING": "utf-8",
+    "LC_ALL": "C.UTF-8",
+    "LANG": "C.UTF-8",
+}
+
+# An absolute path is one of the conditions for posix_spawn (see below).
+GIT = shutil.which("git") or "git"
+
+
+def _resolve_tool(name: str) -> tuple[str, ...]:
+    # The entry-point script installed next to this interpreter skips the
+    # ``runpy`` module lookup of ``python -m``, with the same environment.
+    script = shutil.which(name, path=os.path.dirname(sys.executable))
+    return (script,) if script else (sys.executable, "-m", name)
+
 
+TOOLS: dict[str, tuple[str, ...]] = {
+    name: _resolve_tool(name) for name in ("autoflake", "isort", "black", "ruff")
+}
 
-def run_command(cmd: list[str], cwd: Path = REPO_ROOT) -> RunResult:
+
+# Both checks inspect the installed packages, which back the resolved scripts,
+# instead of spawning ``--help`` so older tool versions keep working.
+@lru_cache
+def black_supports_workers() -> bool:
+    return black is not None and any(
+        "--workers" in param.opts for param in black.main.params
+    )
+
+
+@lru_cache
+def isort_supports_jobs() -> bool:
+    # --jobs has been available since isort 5.0.0.
+    try:
+        version = importlib.metadata.version("isort")
+    except importlib.metadata.PackageNotFoundError:
+        return False
+
+    major = version.partition(".")[0]
+    return major.isdigit() and int(major) >= 5
+
+
+def _spawn_kwargs(cwd: Path) -> dict[str, Any]:
+    """Popen options that let CPython use posix_spawn() instead of fork().
+
+    CPython only takes the posix_spawn path when ``close_fds`` is False, no
+    ``cwd`` is given and the executable is a path with a directory part. It
+    skips copying the parent's page tables, which matters when many
+    formatters are spawned. Keeping fds open is safe: descriptors created by
+    Python are non-inheritable (PEP 446).
+    """
+    return {
+        "cwd": None if Path.cwd() == cwd else cwd,
+        "close_fds": False,
+        "env": _ENV,
+    }
+
+
+def run_command(
+    cmd: list[str],
+    cwd: Path = REPO_ROOT,
+    capture: bool = True,
+) -> RunResult:
+    """Run ``cmd`` and return its exit code and output.
+
+    With ``capture=False`` stdout is sent to ``os.devnull``; stderr is always
+    kept so failures can still be reported.
+    """
     LOGGER.debug("Running: %s", " ".join(cmd))
 
     proc = subprocess.run(
         cmd,
-        cwd=cwd,
-        stdout=subprocess.PIPE,
+        stdout=subprocess.PIPE if capture else subprocess.DEVNULL,
         stderr=subprocess.PIPE,
-        text=True,
-        encoding="utf-8",
-        errors="replace",
-        env=get_env(),
+        **_spawn_kwargs(cwd),
     )
 
-    return RunResult(proc.returncode, proc.stdout, proc.stderr)
+    return RunResult(proc.returncode, proc.stdout or b"", proc.stderr)
 
 
-def get_modified_py_files(branch: str, dir_path: Path) -> list[str]:
-    def git_diff(options: list[str]) -> list[str]:
-        result = run_command(["git", "diff", *options])
-        return result.stdout.splitlines()
+# Size of the stderr tail kept when the output is not requested.
+TAIL_SIZE = 4096
+
+
+async def _read_stream(
+    stream: asyncio.StreamReader | None,
+    limit: int | None = None,
+) -> bytes:
+    # Output is drained as it is produced; with a limit, only a rolling tail of
+    # at most ``limit`` bytes is kept, starting on a line boundary, behind a
+    # marker saying how much was dropped.
+    output = bytearray()
+    truncated = 0
+
+    if stream is None:
+        return bytes(output)
+
+    while chunk := await stream.read(2**16):
+        output += chunk
+        if limit is not None and len(output) > limit:
+            truncated += len(output) - limit
+            del output[:-limit]
 
-    branch_files = git_diff(["--name-only", branch])
-    staged_files = git_diff(["--name-only", "--cached"])
-    unstaged_files = git_diff(["--name-only"])
+    if truncated:
+        start = output.find(b"\n") + 1
+        truncated += start
+        del output[:start]
+        output[:0] = f"... [{truncated} bytes truncated] ...\n".encode()
+
+    return bytes(output)
+
+
+async def run_command_async(
+    cmd: list[str],
+    cwd: Path = REPO_ROOT,
+    capture: bool = True,
+) -> RunResult:
+    """Async counterpart of :func:`run_command`.
+
+    With ``capture=False`` only the last :data:`TAIL_SIZE` bytes of stderr
+    (whole lines, after a truncation marker) are kept, which is enough to
+    report a failure.
+    """
+    LOGGER.debug("Running: %s", " ".join(cmd))
+
+    proc = await asyncio.create_subprocess_exec(
+        *cmd,
+        stdout=asyncio.subprocess.PIPE if capture else asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.PIPE,
+        **_spawn_kwargs(cwd),
+    )
+    stdout, stderr = await asyncio.gather(
+        _read_stream(proc.stdout),
+        _read_stream(proc.stderr, None if capture else TAIL_SIZE),
+    )
+
+    return RunResult(await proc.wait(), stdout, stderr)
+
+
+def _parse_porcelain(output: str) -> Iterator[str]:
+    # Entries are "XY <path>\0"; renames and copies append "<orig_path>\0".
+    entries = iter(output.split("\x00"))
+
+    for entry in entries:
+        if not entry:
+            continue
+
+        status, path = entry[:2], entry[3:]
+
+        if "R" in status or "C" in status:
+            next(entries, None)
+
+        if status not in ("??", "!!"):
+            yield path
+
+
+def get_modified_py_files(branch: str, dir_path: Path) -> list[str]:
+    branch_files = run_command(
+        [GIT, "diff", "--name-only", "-z", "--merge-base", branch]
+    ).stdout.split("\x00")
+    local_files = _parse_porcelain(
+        run_command([GIT, "status", "--porcelain=v1", "-z"]).stdout
+    )
 
-    all_files = set(branch_files + staged_files + unstaged_files)
+    all_files = set(itertools.chain(branch_files, local_files))
+    all_files.discard("")
 
+    # Plain string checks first: only candidates inside ``dir_path`` are
+    # stat'ed.
+    repo_root = str(REPO_ROOT)
+    dir_prefix = os.path.join(str(dir_path.resolve()), "")
     python_files: list[str] = []
 
     for file in all_files:
-        abs_path = REPO_ROOT / file
+        abs_path = os.path.join(repo_root, file)
 
-        if abs_path.suffix == ".py" and abs_path.exists():
-            try:
-                if abs_path.is_relative_to(dir_path):
-                    python_files.append(str(abs_path.resolve()))
-            except AttributeError:
-                if str(abs_path.resolve()).startswith(str(dir_path.resolve())):
-                    python_files.append(str(abs_path.resolve()))
+        if (
+            abs_path.endswith(".py")
+            and abs_path.startswith(dir_prefix)
+            and os.path.exists(abs_path)
+        ):
+            python_files.append(os.path.realpath(abs_path))
 
     return python_files
 
 
+# ------------------------------------------------------------------------------
+# Cache
+# ------------------------------------------------------------------------------
+
+def get_cache_path() -> Path:
+    # Kept inside the git directory so it never shows up as untracked.
+    git_path = run_command([GIT, "rev-parse", "--git-path", "format_code.json"])
+    return REPO_ROOT / git_path.stdout.strip()
+
+
+def load_cache(path: Path) -> dict[str, list]:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def save_cache(cache: dict[str, list], path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(cache), encoding="utf-8")
+
+
+def cache_settings(args: argparse.Namespace) -> str:
+    config_mtimes = []
+    for name in TOOL_CONFIGS:
+        try:
+            config_mtimes.append(os.stat(REPO_ROOT / name).st_mtime_ns)
+        except OSError:
+            config_mtimes.append(0)
+
+    return json.dumps([args.py, args.dry, config_mtimes])
+
+
+def cache_entry(file: str, branch_sha: str, settings: str) -> list:
+    # Any save (mtime/size), move of the base branch or change of the run's
+    # settings invalidates the entry. Only clean files are stored.
+    stat = os.stat(file)
+    return [stat.st_mtime_ns, stat.st_size, branch_sha, settings]
+
+
+# ------------------------------------------------------------------------------
+# Worker pool
+# ------------------------------------------------------------------------------
+
+_POOL: ProcessPoolExecutor | None = None
+
+
+def _preimport() -> None:
+    for name in ("autoflake", "isort", "black"):
+        try:
+            __import__(name)
+        except ImportError:
+            pass
+
+
+def get_pool() -> ProcessPoolExecutor:
+    """Return the process pool shared by the in-process formatters.
+
+    Workers import the formatter packages once and are reused for the whole
+    run, instead of paying interpreter start-up and imports per invocation.
+    """
+    global _POOL
+
+    if _POOL is None:
+        _POOL = ProcessPoolExecutor(
+            max_workers=os.cpu_count(),
+            initializer=_preimport,
+        )
+
+    return _POOL
+
+
+# ``[tool.black]`` keys the in-process path honours. ``include``/``exclude``
+# only apply to directory discovery, never to explicit files. Any other key
+# (``required_version``, ``enable_unstable_feature``...) makes Black run
+# through its CLI instead.
+_BLACK_KEYS = {
+    "line_length",
+    "target_version",
+    "skip_string_normalization",
+    "skip_magic_trailing_comma",
+    "preview",
+    "force_exclude",
+    "include",
+    "exclude",
+    "extend_exclude",
+}
+
+
+@lru_cache
+def _black_config() -> dict[str, Any]:
+    pyproject = black.find_pyproject_toml((str(REPO_ROOT),))
+    return black.parse_pyproject_toml(pyproject) if pyproject else {}
+
+
+def black_in_process() -> bool:
+    return black is not None and _black_config().keys() <= _BLACK_KEYS
+
+
+@lru_cache
+def _black_mode(py_version: str | None) -> "black.Mode":
+    config = _black_config()
+
+    # As on the CLI, an explicit --target-version wins over the config.
+    if py_version:
+        target_versions = {black.TargetVersion[f"PY{py_version}"]}
+    else:
+        target_versions = {
+            black.TargetVersion[version.upper()]
+            for version in config.get("target_version", [])
+        }
+
+    return black.Mode(
+        target_versions=target_versions,
+        line_length=config.get("line_length", black.DEFAULT_LINE_LENGTH),
+        string_normalization=not config.get("skip_string_normalization", False),
+        magic_trailing_comma=not config.get("skip_magic_trailing_comma", False),
+        preview=config.get("preview", False),
+    )
+
+
+@lru_cache
+def _black_force_exclude() -> "re.Pattern[str] | None":
+    pattern = _black_config().get("force_exclude")
+    return black.re_compile_maybe_verbose(pattern) if pattern else None
+
+
+def _black_excluded(path: Path) -> bool:
+    # Same check as the CLI: the pattern is searched in the "/"-prefixed
+    # POSIX path relative to the project root.
+    force_exclude = _black_force_exclude()
+    if force_exclude is None:
+        return False
+
+    root, _ = black.find_project_root((str(path),))
+    normalized = "/" + path.resolve().relative_to(root.resolve()).as_posix()
+    return force_exclude.search(normalized) is not None
+
+
+def _black_format_file(
+    file: str,
+    dry_run: bool = False,
+    py_version: str | None = None,
+) -> RunResult:
+    path = REPO_ROOT / file
+    write_back = black.WriteBack.CHECK if dry_run else black.WriteBack.YES
+
+    try:
+        if _black_excluded(path):
+            return RunResult(0)
+
+        changed = black.format_file_in_place(
+            path,
+            fast=False,
+            mode=_black_mode(py_version),
+            write_back=write_back,
+        )
+    except Exception as exc:
+        return RunResult(123, b"", f"error: cannot format {file}: {exc}".encode())
+
+    if not changed:
+        return RunResult(0)
+
+    if dry_run:
+        return RunResult(1, f"would reformat {file}".encode())
+
+    return RunResult(0, f"reformatted {file}".encode())
+
+
+@lru_cache
+def _autoflake_args(directory: str) -> dict[str, Any]:
+    # Same merge as the CLI: the project's [tool.autoflake] / setup.cfg
+    # settings, overridden by the flags AutoflakeFormatter passes.
+    args, success = autoflake.merge_configuration_file(
+        {
+            "files": [directory],
+            "remove_all_unused_imports": True,
+            "remove_unused_variables": True,
+        }
+    )
+    if not success:
+        raise ValueError("invalid autoflake configuration")
+
+    return dict(args)
+
+
+def _autoflake_fix(path: Path, source: str) -> str:
+    args = _autoflake_args(str(path.parent))
+    exclude = [
+        pattern.strip()
+        for pattern in args.get("exclude", "").split(",")
+        if pattern.strip()
+    ]
+    if autoflake.is_exclude_file(str(path), exclude):
+        return source
+
+    return autoflake.fix_code(
+        source,
+        additional_imports=(
+            args["imports"].split(",") if "imports" in args else None
+        ),
+        expand_star_imports=args["expand_star_imports"],
+        remove_all_unused_imports=args["remove_all_unused_imports"],
+        remove_duplicate_keys=args["remove_duplicate_keys"],
+        remove_unused_variables=args["remove_unused_variables"],
+        remove_rhs_for_unused_variables=args["remove_rhs_for_unused_variables"],
+        ignore_init_module_imports=(
+            args["ignore_init_module_imports"] and path.name == "__init__.py"
+        ),
+        ignore_pass_statements=args["ignore_pass_statements"],
+        ignore_pass_after_docstring=args["ignore_pass_after_docstring"],
+    )
+
+
+def _read_source(path: Path) -> tuple[str, str, str]:
+    # Decoded the way Black does it: PEP 263 cookie (or BOM) for the encoding,
+    # the first line ending for the newline to write back.
+    with open(path, "rb") as f:
+        raw = f.read()
+
+    buffer = io.BytesIO(raw)
+    encoding = tokenize.detect_encoding(buffer.readline)[0]
+    buffer.seek(0)
+    newline = "\r\n" if buffer.readline().endswith(b"\r\n") else "\n"
+    buffer.seek(0)
+
+    with io.TextIOWrapper(buffer, encoding) as text:
+        return text.read(), encoding, newline
+
+
+def _fused_format_file(
+    file: str,
+    dry_run: bool = False,
+    py_version: str | None = None,
+) -> RunResult:
+    path = REPO_ROOT / file
+    isort_options = {"py_version": py_version} if py_version else {}
+
+    try:
+        source, encoding, newline = _read_source(path)
+
+        code = _autoflake_fix(path, source)
+        try:
+            code = isort.code(code, file_path=path, profile="black", **isort_options)
+        except (isort.exceptions.FileSkipComment, isort.exceptions.FileSkipSetting):
+            # Skipped by isort only: the other tools still apply.
+            pass
+        if not _black_excluded(path):
+            mode = _black_mode(py_version)
+            if path.suffix == ".pyi":
+                mode = dataclasses.replace(mode, is_pyi=True)
+            code = black.format_str(code, mode=mode)
+    except Exception as exc:
+        return RunResult(123, b"", f"error: cannot format {file}: {exc}".encode())
+
+    if code == source:
+        return RunResult(0)
+
+    if dry_run:
+        diff = "".join(
+            difflib.unified_diff(
+                source.splitlines(keepends=True),
+                code.splitlines(keepends=True),
+                fromfile=file,
+                tofile=file,
+            )
+        )
+        return RunResult(1, diff.encode())
+
+    with open(path, "w", encoding=encoding, newline=newline) as f:
+        f.write(code)
+
+    return RunResult(0, f"reformatted {file}".encode())
+
+
+async def _run_in_pool(
+    fn: Callable[..., RunResult],
+    files: list[str],
+    **kwargs,
+) -> RunResult:
+    loop = asyncio.get_running_loop()
+    worker = partial(fn, **kwargs)
+
+    return merge_results(
+        await asyncio.gather(
+            *(loop.run_in_executor(get_pool(), worker, file) for file in files)
+        )
+    )
+
+
 # ------------------------------------------------------------------------------
 # Formatter Base
 # ------------------------------------------------------------------------------
 
+# Formatters are slotted dataclasses: zero-argument ``super()`` does not work
+# in their methods, so base-class implementations are called explicitly.
+
+
+@dataclass(frozen=True, slots=True)
 class Formatter(ABC):
+    py_version: str | None = None
+    jobs: int = 1
+    _cmd_prefix_fix: tuple[str, ...] = field(init=False, repr=False)
+    _cmd_prefix_dry: tuple[str, ...] = field(init=False, repr=False)
+
+    # Set when stdout carries diagnostics that must be reported even when the
+    # caller does not ask for the output (e.g. remaining lint violations).
+    always_capture: ClassVar[bool] = False
+
+    def __post_init__(self) -> None:
+        # The flags only depend on the mode, so they are built once and each
+        # command is the prefix followed by the files.
+        object.__setattr__(self, "_cmd_prefix_fix", self._build_prefix(False))
+        object.__setattr__(self, "_cmd_prefix_dry", self._build_prefix(True))
+
     @abstractmethod
-    def run(
+    def _build_prefix(self, dry_run: bool) -> tuple[str, ...]:
+        ...
+
+    def command(self, files: Iterable[str], dry_run: bool = False) -> list[str]:
+        prefix = self._cmd_prefix_dry if dry_run else self._cmd_prefix_fix
+        return [*prefix, *files]
+
+    async def run(
         self,
         files: Iterable[str],
         dry_run: bool = False,
-        py_version: str | None = None,
+        capture: bool = True,
     ) -> RunResult:
-        ...
+        return await run_command_async(
+            self.command(files, dry_run=dry_run),
+            capture=capture or self.always_capture,
+        )
 
 
 # ------------------------------------------------------------------------------
 # Formatters
 # ------------------------------------------------------------------------------
 
+@dataclass(frozen=True, slots=True)
 class AutoflakeFormatter(Formatter):
-    def run(self, files: Iterable[str], dry_run: bool = False, **_) -> RunResult:
+    def _build_prefix(self, dry_run: bool) -> tuple[str, ...]:
         cmd = [
-            sys.executable,
-            "-m",
-            "autoflake",
+            *TOOLS["autoflake"],
             "--remove-unused-variables",
             "--remove-all-unused-imports",
             "--recursive",
@@ -129,57 +648,170 @@ class AutoflakeFormatter(Formatter):
         if not dry_run:
             cmd.append("--in-place")
 
-        return run_command(cmd + list(files))
+        return tuple(cmd)
 
 
+@dataclass(frozen=True, slots=True)
 class IsortFormatter(Formatter):
-    def run(
-        self,
-        files: Iterable[str],
-        dry_run: bool = False,
-        py_version: str | None = None,
-        **_,
-    ) -> RunResult:
-        cmd = [sys.executable, "-m", "isort", "--profile", "black"]
+    def _build_prefix(self, dry_run: bool) -> tuple[str, ...]:
+        cmd = [*TOOLS["isort"], "--profile", "black"]
 
         if dry_run:
             cmd += ["--diff", "--check-only"]
 
-        if py_version:
-            cmd.append(f"--py={py_version}")
+        if self.py_version:
+            cmd.append(f"--py={self.py_version}")
+
+        if self.jobs > 1 and isort_supports_jobs():
+            cmd.append(f"--jobs={self.jobs}")
 
-        return run_command(cmd + list(files))
+        return tuple(cmd)
 
 
+@dataclass(frozen=True, slots=True)
 class BlackFormatter(Formatter):
-    def run(
+    def _build_prefix(self, dry_run: bool) -> tuple[str, ...]:
+        cmd = [*TOOLS["black"]]
+
+        if dry_run:
+            cmd.append("--check")
+
+        if self.py_version:
+            cmd.append(f"--target-version=py{self.py_version}")
+
+        if self.jobs > 1 and black_supports_workers():
+            cmd.append(f"--workers={self.jobs}")
+
+        return tuple(cmd)
+
+    @staticmethod
+    def _in_process(files: list[str]) -> bool:
+        # Directories are left to the CLI, which owns file discovery.
+        return black_in_process() and all(
+            (REPO_ROOT / file).is_file() for file in files
+        )
+
+    async def run(
         self,
         files: Iterable[str],
         dry_run: bool = False,
-        py_version: str | None = None,
-        **_,
+        capture: bool = True,
     ) -> RunResult:
-        cmd = [sys.executable, "-m", "black"]
+        files = list(files)
 
-        if dry_run:
-            cmd.append("--check")
-
-        if py_version:
-            cmd.append(f"--target-version=py{py_version}")
+        if not self._in_process(files):
+            return await Formatter.run(self, files, dry_run=dry_run, capture=capture)
 
-        return run_command(cmd + list(files))
+        return await _run_in_pool(
+            _black_format_file, files, dry_run=dry_run, py_version=self.py_version
+        )
 
 
+@dataclass(frozen=True, slots=True)
 class RuffFormatter(Formatter):
-    def run(self, files: Iterable[str], dry_run: bool = False, **_) -> RunResult:
-        cmd = [sys.executable, "-m", "ruff", "check"]
+    always_capture: ClassVar[bool] = True
+
+    def _build_prefix(self, dry_run: bool) -> tuple[str, ...]:
+        # Ruff already checks files in parallel and needs no jobs flag.
+        cmd = [*TOOLS["ruff"], "check"]
 
         if dry_run:
             cmd.append("--diff")
         else:
             cmd += ["--fix", "--exit-zero"]
 
-        return run_command(cmd + list(files))
+        return tuple(cmd)
+
+    @staticmethod
+    def _mark_reported(result: RunResult, files: list[str]) -> RunResult:
+        # Diagnostics name files relative to the working directory, the
+        # repository root. With --exit-zero this is the only sign that a file
+        # still has lint errors.
+        output = result.raw_stdout
+        result.reported = frozenset(
+            file
+            for file in files
+            if os.fsencode(file) in output
+            or os.fsencode(os.path.relpath(REPO_ROOT / file)) in output
+        )
+        return result
+
+    async def run(
+        self,
+        files: Iterable[str],
+        dry_run: bool = False,
+        capture: bool = True,
+    ) -> RunResult:
+        files = list(files)
+        result = await Formatter.run(self, files, dry_run=dry_run, capture=capture)
+        return self._mark_reported(result, files)
+
+
+@dataclass(frozen=True, slots=True)
+class FusedFormatter(RuffFormatter):
+    """Run the whole Autoflake -> isort -> Black -> Ruff chain on a batch.
+
+    Each file is read once and passed through the Python APIs of Autoflake,
+    isort and Black in memory, and is only written back when it changed.
+    Ruff then checks the whole batch in a single invocation, so its start-up,
+    config discovery and cache load are paid once per batch rather than once
+    per file. Requires autoflake, isort and black to be importable, and
+    explicit files rather than directories.
+    """
+
+    @staticmethod
+    def available(files: Iterable[str]) -> bool:
+        return (
+            autoflake is not None
+            and isort is not None
+            and black_in_process()
+            and all((REPO_ROOT / file).is_file() for file in files)
+        )
+
+    async def run(
+        self,
+        files: Iterable[str],
+        dry_run: bool = False,
+        capture: bool = True,
+    ) -> RunResult:
+        files = list(files)
+        result = await _run_in_pool(
+            _fused_format_file, files, dry_run=dry_run, py_version=self.py_version
+        )
+        ruff = await RuffFormatter.run(self, files, dry_run=dry_run, capture=capture)
+
+        return merge_results([result, ruff])
+
+
+# ------------------------------------------------------------------------------
+# Pipeline
+# ------------------------------------------------------------------------------
+
+def _chunk(seq: list[str], n: int) -> list[list[str]]:
+    return [chunk for chunk in (seq[i::n] for i in range(n)) if chunk]
+
+
+async def _run_pipeline(
+    files: list[str],
+    formatters: list[Formatter],
+    dry_run: bool,
+    capture: bool,
+) -> list[RunResult]:
+    # Formatters must run in order on a given chunk, so only the chunks are
+    # processed concurrently.
+    return [await formatter.run(files, dry_run, capture) for formatter in formatters]
+
+
+async def run_pipelines(
+    chunks: list[list[str]],
+    formatters: list[Formatter],
+    dry_run: bool = False,
+    capture: bool = True,
+) -> list[list[RunResult]]:
+    # There are never more chunks than cores, so all of them run at once.
+    return await asyncio.gather(
+        *(_run_pipeline(chunk, formatters, dry_run, capture) for chunk in chunks)
+    )
 
 
 # ------------------------------------------------------------------------------
@@ -210,6 +842,10 @@ def format_code(args: argparse.Namespace, dir_paths: list[Path]) -> int:
     if args.debug:
         LOGGER.setLevel(logging.DEBUG)
 
+    cache: dict[str, list] | None = None
+    cache_path = Path()
+    branch_sha = settings = ""
+
     if args.fast:
         files: list[str] = []
         for path in dir_paths:
@@ -219,6 +855,20 @@ def format_code(args: argparse.Namespace, dir_paths: list[Path]) -> int:
             LOGGER.info("No modified Python files found.")
             return 0
 
+        branch_sha = run_command([GIT, "rev-parse", args.fast]).stdout.strip()
+        settings = cache_settings(args)
+        cache_path = get_cache_path()
+        cache = load_cache(cache_path)
+        files = [
+            file
+            for file in files
+            if cache.get(file) != cache_entry(file, branch_sha, settings)
+        ]
+
+        if not files:
+            LOGGER.info("Modified Python files are already formatted.")
+            return 0
+
     elif args.filenames:
         files = args.filenames
     else:
@@ -226,30 +876,68 @@ def format_code(args: argparse.Namespace, dir_paths: list[Path]) -> int:
 
     LOGGER.info("Files to format: %s", files)
 
-    formatters: list[Formatter] = [
-        AutoflakeFormatter(),
-        IsortFormatter(),
-        BlackFormatter(),
-        RuffFormatter(),
-    ]
+    cpu_count = os.cpu_count() or 1
+    chunks = _chunk(files, cpu_count)
+
+    # Cores not used by concurrent chunks (e.g. a single directory target)
+    # are handed to the tools' own worker pools.
+    jobs = max(1, cpu_count // len(chunks))
+
+    formatters: list[Formatter]
+
+    if FusedFormatter.available(files):
+        formatters = [FusedFormatter(args.py, jobs)]
+    else:
+        formatters = [
+            AutoflakeFormatter(args.py, jobs),
+            IsortFormatter(args.py, jobs),
+            BlackFormatter(args.py, jobs),
+            RuffFormatter(args.py, jobs),
+        ]
+
+    pipelines = asyncio.run(
+        run_pipelines(
+            chunks,
+            formatters,
+            dry_run=args.dry,
+            capture=args.dry or args.debug,
+        )
+    )
 
     final_code = 0
 
-    for formatter in formatters:
-        result = formatter.run(files, dry_run=args.dry, py_version=args.py)
+    for chunk, results in zip(chunks, pipelines):
+        chunk_code = 0
+        reported: set[str] = set()
+
+        for result in results:
+            reported |= result.reported
+
+            if result.raw_stdout:
+                LOGGER.info(result.stdout)
+
+            if result.raw_stderr:
+                LOGGER.error(result.stderr)
 
-        if result.stdout:
-            LOGGER.info(result.stdout)
+            if result.code != 0:
+                chunk_code = final_code = result.code
 
-        if result.stderr:
-            LOGGER.error(result.stderr)
+        if cache is not None:
+            for file in chunk:
+                if chunk_code == 0 and file not in reported:
+                    cache[file] = cache_entry(file, branch_sha, settings)
+                else:
+                    cache.pop(file, None)
 
-        if result.code != 0:
-            final_code = result.code
+    if cache is not None:
+        save_cache(cache, cache_path)
 
     LOGGER.info("Formatting complete. Exit code: %s", final_code)
     return final_code
 
 
 if __name__ == "__main__":
+    # Commands already run from the repository root; starting there lets
+    # them be spawned without a cwd, i.e. through posix_spawn.
+    os.chdir(REPO_ROOT)
     sys.exit(format_code(get_args(), [APP_PATH]))
@@ -1,7 +1,10 @@
 from __future__ import annotations
 
+import atexit
 import logging
+import queue
 from enum import StrEnum
+from logging.handlers import QueueHandler, QueueListener
 from typing import Any
 
 
@@ -17,16 +20,25 @@ class LogLevel(StrEnum):
     @classmethod
     def get_logging_level(cls, level: str) -> int:
         try:
-            return getattr(logging, level.upper())
-        except AttributeError as exc:
+            return _LEVEL_MAP[level.upper()]
+        except KeyError as exc:
             raise ValueError(f"Invalid log level string: {level}") from exc
 
     @classmethod
     def from_logging_level(cls, level: int) -> LogLevel:
-        for member in cls:
-            if getattr(logging, member.value) == level:
-                return member
-        raise ValueError(f"No LogLevel member corresponds to logging level {level}")
+        try:
+            return _LEVELNO_TO_LEVEL[level]
+        except KeyError as exc:
+            raise ValueError(
+                f"No LogLevel member corresponds to logging level {level}"
+            ) from exc
+
+
+# Standard level names (including aliases such as WARN and NOTSET) to numbers.
+_LEVEL_MAP: dict[str, int] = logging.getLevelNamesMapping()
+_LEVELNO_TO_LEVEL: dict[int, LogLevel] = {
+    _LEVEL_MAP[level]: level for level in LogLevel
+}
 
 
 class CustomFormatter(logging.Formatter):
@@ -42,28 +54,53 @@ class CustomFormatter(logging.Formatter):
 
     RESET = "\x1b[0m"
     BASE_FORMAT = "%(asctime)s - %(name)s - [%(levelname)8s] - %(message)s"
+    DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self._formatters: dict[int, logging.Formatter] = {
+            levelno: logging.Formatter(log_fmt, datefmt=self.DATE_FORMAT)
+            for levelno, log_fmt in _LEVELNO_TO_FMT.items()
+        }
+        self._default = logging.Formatter(_DEFAULT_FMT, datefmt=self.DATE_FORMAT)
 
     def format(self, record: logging.LogRecord) -> str:
-        level_enum = LogLevel.from_logging_level(record.levelno)
-        color = self.COLORS.get(level_enum, self.RESET)
+        return self._formatters.get(record.levelno, self._default).format(record)
 
-        log_fmt = f"{color}{self.BASE_FORMAT}{self.RESET}"
-        formatter = logging.Formatter(log_fmt)
-        return formatter.format(record)
+
+# Resolved once at import: format() runs for every record.
+_LEVELNO_TO_FMT: dict[int, str] = {
+    _LEVEL_MAP[level]: f"{color}{CustomFormatter.BASE_FORMAT}{CustomFormatter.RESET}"
+    for level, color in CustomFormatter.COLORS.items()
+}
+_DEFAULT_FMT = (
+    f"{CustomFormatter.RESET}{CustomFormatter.BASE_FORMAT}{CustomFormatter.RESET}"
+)
 
 
 class LoggerSingleton:
     _instance: LoggerSingleton | None = None
+    _config: dict[str, Any] | None = None
+    _listener: QueueListener | None = None
 
     def __new__(cls, config: dict[str, Any] | None = None):
         if cls._instance is None:
+            default_config = cls._build_config(config)
             cls._instance = super().__new__(cls)
-            cls._instance._initialize_logger(config)
+            atexit.register(cls._instance._stop_listener)
+            cls._instance._initialize_logger(default_config)
+            cls._config = default_config
+            return cls._instance
+
+        # The first configuration wins; later ones never touch the handlers.
+        if config is not None and cls._build_config(config) != cls._config:
+            cls._instance.logger.debug(
+                "Logger already configured, ignoring new configuration: %s", config
+            )
         return cls._instance
 
-    def _initialize_logger(self, config: dict[str, Any] | None = None):
-        self.logger = logging.getLogger("kafka_consumer")
-
+    @staticmethod
+    def _build_config(config: dict[str, Any] | None = None) -> dict[str, Any]:
         default_config: dict[str, Any] = {
             "level": LogLevel.INFO,
             "handlers": ["console"],
@@ -76,7 +113,16 @@ class LoggerSingleton:
         if config:
             default_config.update(config)
 
-        self.logger.handlers.clear()
+        return default_config
+
+    def _initialize_logger(self, default_config: dict[str, Any]):
+        self.logger = logging.getLogger("kafka_consumer")
+
+        self._stop_listener()
+
+        for handler in self.logger.handlers[:]:
+            self.logger.removeHandler(handler)
+            handler.close()
 
         self.logger.setLevel(
             LogLevel.get_logging_level(default_config["level"])
@@ -91,14 +137,39 @@ class LoggerSingleton:
             self.logger.addHandler(console_handler)
 
         if default_config["file_enabled"] and "file" in default_config["handlers"]:
-            file_handler = logging.FileHandler(default_config["file_path"])
-            file_handler.setLevel(
-                LogLevel.get_logging_level(default_config["file_level"])
+            file_level = LogLevel.get_logging_level(default_config["file_level"])
+
+            file_handler = logging.FileHandler(
+                default_config["file_path"], encoding="utf-8"
             )
+            file_handler.setLevel(file_level)
             file_handler.setFormatter(
-                logging.Formatter(CustomFormatter.BASE_FORMAT)
+                logging.Formatter(
+                    CustomFormatter.BASE_FORMAT,
+                    datefmt=CustomFormatter.DATE_FORMAT,
+                )
             )
-            self.logger.addHandler(file_handler)
+
+            # Records are only enqueued on the caller's thread; the listener
+            # thread does the actual file writes.
+            log_queue: queue.Queue[logging.LogRecord] = queue.Queue(-1)
+            queue_handler = QueueHandler(log_queue)
+            queue_handler.setLevel(file_level)
+            self.logger.addHandler(queue_handler)
+
+            self._listener = QueueListener(
+                log_queue, file_handler, respect_handler_level=True
+            )
+            self._listener.start()
+
+    def _stop_listener(self) -> None:
+        if self._listener is None:
+            return
+
+        self._listener.stop()
+        for handler in self._listener.handlers:
+            handler.close()
+        self._listener = None
 
     @classmethod
     def get_logger(
@@ -0,0 +1,48 @@
+import asyncio
+import unittest
+
+from format_code import _read_stream
+
+
+def read(chunks: list[bytes], limit: int | None) -> bytes:
+    async def main() -> bytes:
+        stream = asyncio.StreamReader()
+        for chunk in chunks:
+            stream.feed_data(chunk)
+        stream.feed_eof()
+        return await _read_stream(stream, limit)
+
+    return asyncio.run(main())
+
+
+class ReadStreamTest(unittest.TestCase):
+    def test_without_limit_keeps_everything(self):
+        chunks = [b"a\n" * 3000, b"b" * 5000]
+        self.assertEqual(read(chunks, None), b"".join(chunks))
+
+    def test_under_limit_is_unchanged(self):
+        self.assertEqual(read([b"error: x\n", b"done\n"], 4096), b"error: x\ndone\n")
+
+    def test_tail_is_bounded(self):
+        chunks = [b"L" * 4000 + b"\n", b"P" * 3000, b"P" * 3000]
+        output = read(chunks, 4096)
+        marker, _, tail = output.partition(b"\n")
+
+        self.assertLessEqual(len(tail), 4096)
+        self.assertEqual(tail, b"P" * 4096)
+        self.assertEqual(marker, b"... [5905 bytes truncated] ...")
+
+    def test_tail_starts_on_a_line_boundary(self):
+        data = b"".join(b"line %d\n" % i for i in range(1000))
+        output = read([data[i : i + 100] for i in range(0, len(data), 100)], 100)
+        marker, _, tail = output.partition(b"\n")
+
+        self.assertTrue(marker.startswith(b"... ["))
+        self.assertLessEqual(len(tail), 100)
+        self.assertTrue(data.endswith(tail))
+        self.assertTrue(tail.startswith(b"line "))
+        self.assertEqual(int(marker.split(b"[")[1].split()[0]), len(data) - len(tail))
+
+
+if __name__ == "__main__":
+    unittest.main()